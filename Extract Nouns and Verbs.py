@@ -1,65 +1,173 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import numpy as np
 import spacy
+from spacy.attrs import POS, TAG, LEMMA
+from spacy.symbols import NOUN, VERB
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, zip_longest
 
-# Load English language model
-nlp = spacy.load("en_core_web_sm")
+# spaCy model used for tagging and lemmatization
+MODEL = "en_core_web_sm"
 
-# Load your text file
-with open("LML specification 1.4.txt", "r", encoding="windows-1252") as file:
-    text = file.read()
+# Paragraphs are separated by blank lines (line endings are normalised to \n in extract())
+PARAGRAPH_BREAK = re.compile(r"[ \t]*(?:\r\n?|\n)(?:[ \t]*(?:\r\n?|\n))+")
 
-# Process the text
-doc = nlp(text)
+# Batch size and worker count for nlp.pipe
+BATCH_SIZE = 64
+N_PROCESS = max(1, (os.cpu_count() or 1) - 1)
+
+# Output file buffer size (1 MiB)
+WRITE_BUFFER = 1 << 20
+
+# Turtle prefixes and class declarations
+TTL_HEADER = (
+    '@prefix : <http://example.org/ontology#> .\n'
+    '@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .\n\n'
+    ':Noun rdf:type rdf:Class .\n'
+    ':Verb rdf:type rdf:Class .\n\n'
+)
+
+# Spaces are not allowed in Turtle local names
+SPACE_TO_UNDERSCORE = str.maketrans(" ", "_")
 
-# Extract singular common nouns (filtering out plural nouns)
-nouns = [token.lemma_ for token in doc if token.pos_ == "NOUN" and token.tag_ != "NNS"]
-
-# Extract base-form verbs
-verbs = [token.lemma_ for token in doc if token.pos_ == "VERB"]
-
-# Remove duplicates
-unique_nouns = sorted(set(nouns))
-unique_verbs = sorted(set(verbs))
-
-# -------------------------------
-# ✨ 1. Write to CSV
-# -------------------------------
-with open("extracted_words.csv", "w", newline='', encoding="latin-1") as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(["Nouns", "Verbs"])
-
-    # Write rows — zip fills to the shorter of the two
-    for noun, verb in zip(unique_nouns, unique_verbs):
-        writer.writerow([noun, verb])
-
-    # Handle unmatched lengths
-    if len(unique_nouns) > len(unique_verbs):
-        for noun in unique_nouns[len(unique_verbs):]:
-            writer.writerow([noun, ""])
-    elif len(unique_verbs) > len(unique_nouns):
-        for verb in unique_verbs[len(unique_nouns):]:
-            writer.writerow(["", verb])
-
-print("✅ CSV file saved as 'extracted_words.csv'")
-
-# -------------------------------
-# ✨ 2. Write to TTL (Turtle)
-# -------------------------------
-with open("extracted_words.ttl", "w", encoding="utf-8") as ttlfile:
-    ttlfile.write('@prefix : <http://example.org/ontology#> .\n')
-    ttlfile.write('@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .\n\n')
-
-    # Declare classes
-    ttlfile.write(':Noun rdf:type rdf:Class .\n')
-    ttlfile.write(':Verb rdf:type rdf:Class .\n\n')
-
-    # Write individuals
-    for noun in unique_nouns:
-        safe_noun = noun.replace(" ", "_")
-        ttlfile.write(f':{safe_noun} rdf:type :Noun .\n')
-
-    ttlfile.write('\n')
-
-
-
-print("✅ Turtle file saved as 'extracted_words.ttl'")
\ No newline at end of file
+# Extraction results for previously processed corpora
+CACHE_DIR = ".cache"
+
+
+@functools.lru_cache(maxsize=1)
+def get_nlp():
+    """
+    Load the English language model once and share it between extractions
+
+    Only the tagger, attribute_ruler (coarse POS) and lemmatizer are needed for
+    POS/lemma filtering, so the parser and NER are excluded and never loaded.
+
+    Returns:
+        spacy.language.Language: Tagging and lemmatization pipeline
+    """
+    return spacy.load(MODEL, exclude=["parser", "ner"])
+
+
+def extract(path, encoding, n_process=N_PROCESS):
+    """
+    Extract singular common nouns and base-form verbs from a text file
+
+    Results are cached in CACHE_DIR, keyed on the file contents, encoding and
+    model version, so unchanged corpora are not run through spaCy again.
+
+    Args:
+        path (str): Path to the text file
+        encoding (str): Encoding of the text file
+        n_process (int): Number of worker processes for nlp.pipe
+
+    Returns:
+        tuple: Sorted lists of unique nouns and unique verbs
+    """
+    # Load your text file
+    with open(path, "rb") as file:
+        raw = file.read()
+
+    key = hashlib.blake2b(raw)
+    key.update(f"\0{encoding}\0{MODEL}\0{spacy.util.get_package_version(MODEL)}".encode())
+    cache_path = os.path.join(CACHE_DIR, f"{key.hexdigest()}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as file:
+                unique_nouns, unique_verbs = json.load(file)
+            return unique_nouns, unique_verbs
+        except ValueError:
+            # A corrupt or truncated cache entry is treated as a miss and rewritten below
+            pass
+
+    nlp = get_nlp()
+
+    # Decode in one call, then translate CR/CRLF line endings to "\n" as text mode would
+    text = raw.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+
+    # Split into paragraphs so spaCy can stream them in batches
+    paragraphs = (p for p in PARAGRAPH_BREAK.split(text) if p.strip())
+
+    # POS values are spaCy symbol IDs; the fine-grained tag is a StringStore hash
+    strings = nlp.vocab.strings
+    plural_tag = strings["NNS"]
+
+    noun_hashes = set()
+    verb_hashes = set()
+
+    # Process the text
+    for doc in nlp.pipe(paragraphs, batch_size=BATCH_SIZE, n_process=n_process):
+        # One (tokens x 3) uint64 matrix per doc instead of per-token attribute access
+        arr = doc.to_array([POS, TAG, LEMMA])
+        pos = arr[:, 0]
+
+        # Extract singular common nouns (filtering out plural nouns)
+        noun_hashes.update(np.unique(arr[(pos == NOUN) & (arr[:, 1] != plural_tag), 2]).tolist())
+
+        # Extract base-form verbs
+        verb_hashes.update(np.unique(arr[pos == VERB, 2]).tolist())
+
+    # Lemma hashes are already unique, so only they are resolved back to strings
+    unique_nouns = sorted(strings[h] for h in noun_hashes)
+    unique_verbs = sorted(strings[h] for h in verb_hashes)
+
+    # Write to a temporary file first so an interrupted run never leaves a truncated cache entry
+    # (per process, since the same corpus may be extracted by several workers at once)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump([unique_nouns, unique_verbs], file)
+    os.replace(tmp_path, cache_path)
+
+    return unique_nouns, unique_verbs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract singular nouns and base-form verbs from text files')
+    parser.add_argument('input_files', nargs='*', default=["LML specification 1.4.txt"],
+                        help='Paths to the input .txt files (default: the LML specification)')
+    parser.add_argument('--encoding', default="windows-1252", help='Encoding of the input files')
+    args = parser.parse_args()
+
+    if len(args.input_files) > 1:
+        # Corpora are independent, so extract them concurrently and share the pipe workers between them
+        n_process = max(1, N_PROCESS // len(args.input_files))
+        with ProcessPoolExecutor(max_workers=min(len(args.input_files), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(extract, args.input_files, repeat(args.encoding), repeat(n_process)))
+    else:
+        results = [extract(args.input_files[0], args.encoding)]
+
+    # Merge the vocabularies of all corpora
+    unique_nouns = sorted(set().union(*(nouns for nouns, _ in results)))
+    unique_verbs = sorted(set().union(*(verbs for _, verbs in results)))
+
+    # -------------------------------
+    # ✨ 1. Write to CSV
+    # -------------------------------
+    with open("extracted_words.csv", "w", newline='', encoding="latin-1", buffering=WRITE_BUFFER) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Nouns", "Verbs"])
+
+        # Write rows — the shorter column is padded with empty cells
+        writer.writerows(zip_longest(unique_nouns, unique_verbs, fillvalue=""))
+
+    print("✅ CSV file saved as 'extracted_words.csv'")
+
+    # -------------------------------
+    # ✨ 2. Write to TTL (Turtle)
+    # -------------------------------
+    with open("extracted_words.ttl", "w", encoding="utf-8", buffering=WRITE_BUFFER) as ttlfile:
+        # Prefixes, class declarations and individuals of every corpus in a single write
+        individuals = "".join(f':{noun.translate(SPACE_TO_UNDERSCORE)} rdf:type :Noun .\n' for noun in unique_nouns)
+        ttlfile.write(f"{TTL_HEADER}{individuals}\n")
+
+    print("✅ Turtle file saved as 'extracted_words.ttl'")
+
+
+if __name__ == "__main__":
+    main()
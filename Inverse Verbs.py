@@ -1,6 +1,51 @@
 import csv
 from spellchecker import SpellChecker
 
+# Dictionary for irregular verbs
+IRREGULAR_VERBS = {
+    "am": "is for",
+    "is": "is for",
+    "are": "are for",
+    "was": "was for",
+    "were": "were for",
+    "have": "belongs to",
+    "has": "belongs to",
+    "had": "belonged to",
+    "do": "done by",
+    "does": "done by",
+    "did": "done by",
+    "go": "visited by",
+    "goes": "visited by",
+    "went": "visited by",
+    "make": "made by",
+    "makes": "made by",
+    "made": "made by",
+    "see": "seen by",
+    "sees": "seen by",
+    "saw": "seen by",
+    "write": "written by",
+    "writes": "written by",
+    "wrote": "written by",
+    "create": "created by",
+    "creates": "created by",
+    "design": "designed by",
+    "designs": "designed by",
+    "build": "built by",
+    "builds": "built by",
+    "develop": "developed by",
+    "develops": "developed by",
+    "implement": "implemented by",
+    "implements": "implemented by",
+    "manage": "managed by",
+    "manages": "managed by"
+}
+
+# Header names accepted for the verb column of an input CSV
+VERB_HEADERS = {"verb", "verbs"}
+
+# Consonant + "t" endings, checked with a single str.endswith call
+CONSONANT_T_ENDINGS = tuple(c + 't' for c in 'bcdfghjklmnpqrstvwxz')
+
 
 def get_inverse_verb(verb):
     """
@@ -12,49 +57,10 @@ def get_inverse_verb(verb):
     Returns:
         str: The inverted verb phrase
     """
-    # Dictionary for irregular verbs
-    irregular_verbs = {
-        "am": "is for",
-        "is": "is for",
-        "are": "are for",
-        "was": "was for",
-        "were": "were for",
-        "have": "belongs to",
-        "has": "belongs to",
-        "had": "belonged to",
-        "do": "done by",
-        "does": "done by",
-        "did": "done by",
-        "go": "visited by",
-        "goes": "visited by",
-        "went": "visited by",
-        "make": "made by",
-        "makes": "made by",
-        "made": "made by",
-        "see": "seen by",
-        "sees": "seen by",
-        "saw": "seen by",
-        "write": "written by",
-        "writes": "written by",
-        "wrote": "written by",
-        "create": "created by",
-        "creates": "created by",
-        "design": "designed by",
-        "designs": "designed by",
-        "build": "built by",
-        "builds": "built by",
-        "develop": "developed by",
-        "develops": "developed by",
-        "implement": "implemented by",
-        "implements": "implemented by",
-        "manage": "managed by",
-        "manages": "managed by"
-    }
-
     # Check if it's in our irregular verbs dictionary
     verb_lower = verb.lower()
-    if verb_lower in irregular_verbs:
-        return irregular_verbs[verb_lower]
+    if verb_lower in IRREGULAR_VERBS:
+        return IRREGULAR_VERBS[verb_lower]
 
     # Regular verb transformations
 
@@ -63,7 +69,7 @@ def get_inverse_verb(verb):
         return verb_lower + 'd by'
     elif verb_lower.endswith('y'):
         return verb_lower[:-1] + 'ied by'
-    elif any(verb_lower.endswith(c + 't') for c in 'bcdfghjklmnpqrstvwxz'):
+    elif verb_lower.endswith(CONSONANT_T_ENDINGS):
         # Verbs ending in a consonant + t (except when preceded by a vowel)
         return verb_lower + 'ted by'
     elif len(verb_lower) >= 3:
@@ -81,6 +87,29 @@ def get_inverse_verb(verb):
         return verb_lower + 'ed by'
 
 
+def get_inverse_verbs(verbs):
+    """
+    Generates inverse forms for a batch of verbs, inverting each distinct
+    lowercase form only once
+
+    Args:
+        verbs (iterable): The verbs to invert
+
+    Returns:
+        dict: Dictionary mapping each verb to its inverted verb phrase
+    """
+    inverses = {}
+    by_lower = {}
+
+    for verb in verbs:
+        verb_lower = verb.lower()
+        if verb_lower not in by_lower:
+            by_lower[verb_lower] = get_inverse_verb(verb_lower)
+        inverses[verb] = by_lower[verb_lower]
+
+    return inverses
+
+
 def check_spelling(verbs):
     """
     Check and correct spelling of verbs
@@ -94,16 +123,16 @@ def check_spelling(verbs):
     spell = SpellChecker()
     corrections = {}
 
-    for verb in verbs:
-        if not verb:
-            continue
+    # Lowercase once and find all misspelled verbs in a single lookup
+    words = [verb for verb in verbs if verb]
+    lowered = [verb.lower() for verb in words]
+    misspelled = spell.unknown(lowered)
 
-        # Check if the verb is misspelled
-        misspelled = spell.unknown([verb.lower()])
-        if misspelled:
+    for verb, verb_lower in zip(words, lowered):
+        if verb_lower in misspelled:
             # Get the most likely correction
-            correction = spell.correction(verb.lower())
-            if correction and correction != verb.lower():
+            correction = spell.correction(verb_lower)
+            if correction and correction != verb_lower:
                 corrections[verb] = correction
 
     return corrections
@@ -124,15 +153,13 @@ def process_verbs_from_csv(input_csv_path, output_csv_path=None, check_spelling_
     """
     verbs = []
     try:
-        # Try to read the CSV file - first check if it has headers
+        # Try to read the CSV file - the first row is either a header or a verb
         with open(input_csv_path, 'r', newline='') as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-            has_header = csv.Sniffer().has_header(sample)
-
             reader = csv.reader(csvfile)
-            if has_header:
-                next(reader)  # Skip header if present
+
+            first = next(reader, None)
+            if first and first[0].strip().lower() not in VERB_HEADERS:
+                verbs.append(first[0].strip())  # No header, keep the first verb
 
             for row in reader:
                 if row:  # Ensure row is not empty
@@ -145,6 +172,9 @@ def process_verbs_from_csv(input_csv_path, output_csv_path=None, check_spelling_
         print(f"Error reading CSV file: {e}")
         return {}
 
+    # Drop empty and repeated verbs, keeping first-seen order
+    verbs = list(dict.fromkeys(v for v in verbs if v))
+
     # Dictionary to track original and corrected verbs
     corrections = {}
     applied_corrections = False
@@ -175,19 +205,22 @@ def process_verbs_from_csv(input_csv_path, output_csv_path=None, check_spelling_
             print("Continuing without spell checking...")
 
     # Generate inverse for each verb
-    results = {}
     original_to_corrected = {}
 
+    # Reverse lookup from corrected verb to the first original that produced it
+    corrected_to_original = {}
+    for orig, corr in corrections.items():
+        corrected_to_original.setdefault(corr, orig)
+
     for i, verb in enumerate(verbs):
         if not verb:  # Skip empty strings
             continue
 
         # Keep track of original and possibly corrected verbs
-        original_verb = list(corrections.keys())[
-            list(corrections.values()).index(verb)] if verb in corrections.values() else verb
+        original_verb = corrected_to_original.get(verb, verb)
         original_to_corrected[original_verb] = verb
 
-        results[verb] = get_inverse_verb(verb)
+    results = get_inverse_verbs(v for v in verbs if v)
 
     # Write results to output CSV if specified
     if output_csv_path:
@@ -199,16 +232,14 @@ def process_verbs_from_csv(input_csv_path, output_csv_path=None, check_spelling_
                 if applied_corrections and corrections:
                     writer.writerow(['Original', 'Corrected', 'Inverse'])
 
-                    # For each original verb, write the corrected version and its inverse
-                    for original, corrected in original_to_corrected.items():
-                        if original != corrected:  # This is a corrected verb
-                            writer.writerow([original, corrected, results[corrected]])
-                        else:  # This verb had no correction
-                            writer.writerow([original, '', results[original]])
+                    # For each original verb, write the corrected version (blank if unchanged) and its inverse
+                    writer.writerows(
+                        [original, corrected if original != corrected else '', results[corrected]]
+                        for original, corrected in original_to_corrected.items()
+                    )
                 else:
                     writer.writerow(['Verb', 'Inverse'])  # Write header
-                    for verb, inverse in results.items():
-                        writer.writerow([verb, inverse])
+                    writer.writerows(results.items())
 
             print(f"Results saved to {output_csv_path}")
         except Exception as e:
@@ -250,8 +281,7 @@ def save_spelling_corrections(corrections, output_path):
         with open(output_path, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(['Original', 'Correction'])
-            for original, correction in corrections.items():
-                writer.writerow([original, correction])
+            writer.writerows(corrections.items())
         print(f"Spelling corrections saved to {output_path}")
     except Exception as e:
         print(f"Error saving spelling corrections: {e}")
@@ -1,6 +1,62 @@
 import csv
 import argparse
 import os
+import re
+from functools import lru_cache
+from itertools import chain
+
+# Dictionary for irregular verbs
+IRREGULAR_VERBS = {
+    "am": "is for",
+    "is": "is for",
+    "are": "are for",
+    "was": "was for",
+    "were": "were for",
+    "have": "belongs to",
+    "has": "belongs to",
+    "had": "belonged to",
+    "do": "done by",
+    "does": "done by",
+    "did": "done by",
+    "go": "visited by",
+    "goes": "visited by",
+    "went": "visited by",
+    "make": "made by",
+    "makes": "made by",
+    "made": "made by",
+    "see": "seen by",
+    "sees": "seen by",
+    "saw": "seen by",
+    "write": "written by",
+    "writes": "written by",
+    "wrote": "written by",
+    "create": "created by",
+    "creates": "created by",
+    "design": "designed by",
+    "designs": "designed by",
+    "build": "built by",
+    "builds": "built by",
+    "develop": "developed by",
+    "develops": "developed by",
+    "implement": "implemented by",
+    "implements": "implemented by",
+    "manage": "managed by",
+    "manages": "managed by"
+}
+
+# Regular verb endings: "e", "y", or a consonant followed by "t"
+SUFFIX_RE = re.compile(r'(?:(e)|(y)|([bcdfghjklmnpqrstvwxz]t))\Z')
+
+# Byte lookup table: 1 for a vowel, 0 otherwise (used for the consonant-vowel-consonant check)
+VOWEL_TABLE = bytes(1 if chr(i) in 'aeiou' else 0 for i in range(256))
+Y_BYTE = ord('y')
+
+# CSV file buffer size (1 MiB)
+IO_BUFFER = 1 << 20
+
+# Inputs larger than this skip csv.Sniffer; a header row is recognised by its column names instead
+SNIFF_MAX_BYTES = 1 << 20
+HEADER_NAMES = {'Subject', 'Predicate', 'Object'}
 
 
 def get_inverse_verb(verb):
@@ -13,66 +69,43 @@ def get_inverse_verb(verb):
     Returns:
         str: The inverted verb phrase
     """
-    # Dictionary for irregular verbs
-    irregular_verbs = {
-        "am": "is for",
-        "is": "is for",
-        "are": "are for",
-        "was": "was for",
-        "were": "were for",
-        "have": "belongs to",
-        "has": "belongs to",
-        "had": "belonged to",
-        "do": "done by",
-        "does": "done by",
-        "did": "done by",
-        "go": "visited by",
-        "goes": "visited by",
-        "went": "visited by",
-        "make": "made by",
-        "makes": "made by",
-        "made": "made by",
-        "see": "seen by",
-        "sees": "seen by",
-        "saw": "seen by",
-        "write": "written by",
-        "writes": "written by",
-        "wrote": "written by",
-        "create": "created by",
-        "creates": "created by",
-        "design": "designed by",
-        "designs": "designed by",
-        "build": "built by",
-        "builds": "built by",
-        "develop": "developed by",
-        "develops": "developed by",
-        "implement": "implemented by",
-        "implements": "implemented by",
-        "manage": "managed by",
-        "manages": "managed by"
-    }
+    return _get_inverse_verb_lower(verb.lower())
 
+
+@lru_cache(maxsize=1024)
+def _get_inverse_verb_lower(verb_lower):
+    """
+    Cached implementation of get_inverse_verb for an already lowercased verb,
+    so each distinct predicate is only inverted once regardless of case
+
+    Args:
+        verb_lower (str): The lowercased verb to invert
+
+    Returns:
+        str: The inverted verb phrase
+    """
     # Check if it's in our irregular verbs dictionary
-    verb_lower = verb.lower()
-    if verb_lower in irregular_verbs:
-        return irregular_verbs[verb_lower]
+    inverse = IRREGULAR_VERBS.get(verb_lower)
+    if inverse is not None:
+        return inverse
 
     # Regular verb transformations
 
-    # Handle common verb endings
-    if verb_lower.endswith('e'):
+    # Handle common verb endings with a single suffix match
+    ending = SUFFIX_RE.search(verb_lower)
+    if ending and ending.group(1):
         return verb_lower + 'd by'
-    elif verb_lower.endswith('y'):
+    elif ending and ending.group(2):
         return verb_lower[:-1] + 'ied by'
-    elif any(verb_lower.endswith(c + 't') for c in 'bcdfghjklmnpqrstvwxz'):
+    elif ending:
         # Verbs ending in a consonant + t (except when preceded by a vowel)
         return verb_lower + 'ted by'
     elif len(verb_lower) >= 3:
-        # Check for consonant-vowel-consonant pattern
-        last_three = verb_lower[-3:]
-        if (last_three[0] not in 'aeiou' and
-                last_three[1] in 'aeiou' and
-                last_three[2] not in 'aeiouy'):
+        # Check for consonant-vowel-consonant pattern (one byte per character; others become '?')
+        last_three = verb_lower[-3:].encode('latin-1', 'replace')
+        if (not VOWEL_TABLE[last_three[0]] and
+                VOWEL_TABLE[last_three[1]] and
+                not VOWEL_TABLE[last_three[2]] and last_three[2] != Y_BYTE):
             return verb_lower + verb_lower[-1] + 'ed by'
         else:
             # Default case
@@ -82,7 +115,7 @@ def get_inverse_verb(verb):
         return verb_lower + 'ed by'
 
 
-def invert_triples(input_csv, output_csv):
+def invert_triples(input_csv, output_csv, has_header=None):
     """
     Read RDF triples from a CSV file, invert them by swapping subject and object,
     and transform the predicate using verb inversion logic.
@@ -90,21 +123,37 @@ def invert_triples(input_csv, output_csv):
     Args:
         input_csv (str): Path to the input CSV file containing RDF triples
         output_csv (str): Path to save the inverted triples
+        has_header (bool, optional): Whether the input CSV starts with a header row.
+                                     If None, it is detected from the file.
     """
     # Check if input file exists
     if not os.path.exists(input_csv):
         print(f"Error: Input file '{input_csv}' not found.")
         return
 
+    # Rows are streamed to a temporary file that replaces the output only once every row is written,
+    # so the output may be the input itself and a failure never leaves it truncated
+    tmp_csv = f"{output_csv}.tmp"
+
     try:
-        # Determine if the input CSV has headers
-        with open(input_csv, 'r', newline='', encoding='utf-8') as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-            has_header = csv.Sniffer().has_header(sample)
+        with open(input_csv, 'r', newline='', encoding='utf-8', buffering=IO_BUFFER) as csvfile:
+            if has_header is None and os.path.getsize(input_csv) <= SNIFF_MAX_BYTES:
+                # Determine if the input CSV has headers
+                sample = csvfile.read(1024)
+                csvfile.seek(0)
+                has_header = csv.Sniffer().has_header(sample)
 
             reader = csv.reader(csvfile)
-            header = next(reader) if has_header else None
+
+            if has_header is None:
+                # Too large to sniff: the first row is a header if it names any of the triple columns
+                first = next(reader, [])
+                has_header = not HEADER_NAMES.isdisjoint(first)
+                header = first if has_header else None
+                if not has_header:
+                    reader = chain([first], reader)
+            else:
+                header = next(reader) if has_header else None
 
             # Determine column indices for subject, predicate, object
             if has_header:
@@ -116,43 +165,49 @@ def invert_triples(input_csv, output_csv):
                 # Default column positions
                 subj_idx, pred_idx, obj_idx = 0, 1, 2
 
-            # Read all triples
-            triples = []
-            for row in reader:
-                if len(row) >= 3:  # Ensure row has enough columns
-                    triples.append((row[subj_idx], row[pred_idx], row[obj_idx]))
-
-        # Invert the triples
-        inverted_triples = []
-        for subj, pred, obj in triples:
-            inverted_pred = get_inverse_verb(pred)
-            inverted_triples.append((obj, inverted_pred, subj))  # Swap subject and object
+            with open(tmp_csv, 'w', newline='', encoding='utf-8', buffering=IO_BUFFER) as outfile:
+                writer = csv.writer(outfile)
 
-        # Write inverted triples to output file
-        with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
+                # Write header
+                if has_header:
+                    writer.writerow(['Subject', 'Predicate', 'Object'])
 
-            # Write header
-            if has_header:
-                writer.writerow(['Subject', 'Predicate', 'Object'])
+                # Invert and write each triple as it is read, inverting each distinct predicate only once
+                inverses = {}
+                count = 0
+                for row in reader:
+                    if len(row) >= 3:  # Ensure row has enough columns
+                        pred = row[pred_idx]
+                        inverted_pred = inverses.get(pred)
+                        if inverted_pred is None:
+                            inverted_pred = inverses[pred] = get_inverse_verb(pred)
 
-            # Write inverted triples
-            for triple in inverted_triples:
-                writer.writerow(triple)
+                        # Swap subject and object
+                        writer.writerow((row[obj_idx], inverted_pred, row[subj_idx]))
+                        count += 1
 
-        print(f"Successfully inverted {len(inverted_triples)} triples and saved to {output_csv}")
+        os.replace(tmp_csv, output_csv)
+        print(f"Successfully inverted {count} triples and saved to {output_csv}")
 
     except Exception as e:
         print(f"Error processing CSV file: {e}")
+        if os.path.exists(tmp_csv):
+            os.remove(tmp_csv)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Invert RDF triples from CSV and transform predicates')
     parser.add_argument('input_csv', help='Path to input CSV file containing RDF triples')
     parser.add_argument('output_csv', help='Path to output CSV file for inverted triples')
+    header_group = parser.add_mutually_exclusive_group()
+    header_group.add_argument('--header', dest='has_header', action='store_const', const=True,
+                              help='The input CSV has a header row (skips header detection)')
+    header_group.add_argument('--no-header', dest='has_header', action='store_const', const=False,
+                              help='The input CSV has no header row (skips header detection)')
+    parser.set_defaults(has_header=None)
     args = parser.parse_args()
 
-    invert_triples(args.input_csv, args.output_csv)
+    invert_triples(args.input_csv, args.output_csv, args.has_header)
 
 
 if __name__ == "__main__":
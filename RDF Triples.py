@@ -1,6 +1,42 @@
+import io
 import spacy
+from spacy.strings import get_string_id
+from spacy.symbols import NOUN, PRON, PROPN, VERB
+import os
 import re
-from typing import List, Tuple, Dict, Optional
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, List, Tuple, Dict, Optional, TextIO
+
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK = re.compile(r"[ \t]*(?:\r\n?|\n)(?:[ \t]*(?:\r\n?|\n))+")
+
+# Batch size and worker count for nlp.pipe
+BATCH_SIZE = 64
+N_PROCESS = max(1, (os.cpu_count() or 1) - 1)
+
+# Objects that are numbers, or contain any of these characters, are written as literals
+_NUM_RE = re.compile(r'^[0-9]+$')
+_LIT_CHARS = frozenset(',."\'(){}[]')
+
+# Characters stripped from URI parts
+_NON_URI_RE = re.compile(r'[^a-zA-Z0-9 ]')
+
+# Integer IDs of dependency labels, compared against token.dep instead of the dep_ strings
+_ROOT = get_string_id("ROOT")
+_PREP = get_string_id("prep")
+_POBJ = get_string_id("pobj")
+_SUBJECT_DEPS = frozenset(get_string_id(dep) for dep in ("nsubj", "nsubjpass"))
+_OBJECT_DEPS = frozenset(get_string_id(dep) for dep in ("dobj", "attr", "pobj"))
+_CLAUSE_DEPS = frozenset(get_string_id(dep) for dep in ("ccomp", "xcomp", "advcl"))
+
+# Dependencies of modifiers included in an expanded noun phrase
+_MODIFIER_DEPS = frozenset(get_string_id(dep) for dep in ("det", "amod", "compound", "nummod", "quantmod"))
+_TRAILING_MODIFIER_DEPS = frozenset(get_string_id(dep) for dep in ("amod", "compound"))
+
+# Parts of speech (spaCy symbol IDs) that head or form a noun phrase
+_NOUN_POS = frozenset({NOUN, PROPN})
+_NOUN_PHRASE_POS = frozenset({NOUN, PROPN, PRON})
 
 
 class RDFTripleExtractor:
@@ -9,14 +45,40 @@ class RDFTripleExtractor:
     based on noun and verb relationships.
     """
 
-    def __init__(self, model: str = "en_core_web_lg"):
+    # Common abbreviations expanded by preprocess_text
+    _ABBREVIATIONS = {
+        "won't": "will not",
+        "can't": "cannot",
+        "n't": " not",
+        "'re": " are",
+        "'s": " is",
+        "'m": " am",
+        "'ll": " will"
+    }
+
+    # Longest keys first so "won't"/"can't" win over "n't"
+    _ABBREVIATION_RE = re.compile("|".join(re.escape(abbr) for abbr in sorted(_ABBREVIATIONS, key=len, reverse=True)))
+    _WHITESPACE_RE = re.compile(r'\s+')
+
+    def __init__(self, model: str = "en_core_web_lg", use_gpu: bool = False, n_process: int = 1):
         """
         Initialize the extractor with a spaCy model.
 
         Args:
-            model: The spaCy model to use (default: en_core_web_lg for best results)
+            model: The spaCy model to use (default: en_core_web_lg for best results;
+                   en_core_web_trf gains the most from use_gpu)
+            use_gpu: Run the pipeline on a CUDA GPU (raises an error if none is available)
+            n_process: Worker processes for nlp.pipe (ignored with use_gpu)
         """
-        self.nlp = spacy.load(model)
+        if use_gpu:
+            # Has to happen before the model is loaded
+            spacy.require_gpu()
+
+        # Named entities are never used
+        self.nlp = spacy.load(model, disable=["ner"])
+
+        # The GPU batches on a single device, so worker processes are only used on CPU
+        self.n_process = 1 if use_gpu else n_process
 
     def preprocess_text(self, text: str) -> str:
         """
@@ -29,23 +91,10 @@ class RDFTripleExtractor:
             Preprocessed text
         """
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-
-        # Replace common abbreviations
-        abbreviations = {
-            "won't": "will not",
-            "can't": "cannot",
-            "n't": " not",
-            "'re": " are",
-            "'s": " is",
-            "'m": " am",
-            "'ll": " will"
-        }
+        text = self._WHITESPACE_RE.sub(' ', text).strip()
 
-        for abbr, expanded in abbreviations.items():
-            text = text.replace(abbr, expanded)
-
-        return text
+        # Replace common abbreviations in a single pass
+        return self._ABBREVIATION_RE.sub(lambda m: self._ABBREVIATIONS[m.group(0)], text)
 
     def extract_triples(self, text: str) -> List[Dict[str, str]]:
         """
@@ -57,16 +106,50 @@ class RDFTripleExtractor:
         Returns:
             List of dictionaries, each containing subject, predicate, and object
         """
-        text = self.preprocess_text(text)
-        doc = self.nlp(text)
-        triples = []
+        return self._extract_triples_from_documents([text], BATCH_SIZE)[0]
+
+    def extract_triples_batch(self, texts: Iterable[str], batch_size: int = 128) -> List[List[Dict[str, str]]]:
+        """
+        Extract RDF triples from many documents, batching them through the pipeline.
+
+        Args:
+            texts: Input documents to process
+            batch_size: Number of paragraphs per batch
+
+        Returns:
+            List of triples for each document, in input order
+        """
+        return self._extract_triples_from_documents(texts, batch_size)
+
+    def _extract_triples_from_documents(self, texts: Iterable[str], batch_size: int) -> List[List[Dict[str, str]]]:
+        """
+        Pipe the paragraphs of every document together and regroup their triples by document.
+
+        Args:
+            texts: Input documents to process
+            batch_size: Number of paragraphs per batch
+
+        Returns:
+            List of triples for each document, in input order
+        """
+        results = []
+
+        def paragraphs():
+            for text in texts:
+                results.append([])
+                index = len(results) - 1
+                # Preprocess paragraph by paragraph (preprocessing collapses the blank lines between them)
+                for paragraph in PARAGRAPH_BREAK.split(text):
+                    if paragraph.strip():
+                        yield self.preprocess_text(paragraph), index
 
         # Process each sentence separately
-        for sent in doc.sents:
-            sentence_triples = self._extract_triples_from_sentence(sent)
-            triples.extend(sentence_triples)
+        for doc, index in self.nlp.pipe(paragraphs(), as_tuples=True, batch_size=batch_size,
+                                        n_process=self.n_process):
+            for sent in doc.sents:
+                results[index].extend(self._extract_triples_from_sentence(sent))
 
-        return triples
+        return results
 
     def _extract_triples_from_sentence(self, sent) -> List[Dict[str, str]]:
         """
@@ -80,12 +163,16 @@ class RDFTripleExtractor:
         """
         triples = []
 
-        # Find the root verb of the sentence
+        # Find the root verb and any clause verbs in a single pass over the sentence
         root = None
+        clause_verbs = []
         for token in sent:
-            if token.dep_ == "ROOT" and token.pos_ == "VERB":
-                root = token
-                break
+            if token.pos == VERB:
+                if token.dep == _ROOT:
+                    if root is None:
+                        root = token
+                elif token.dep in _CLAUSE_DEPS:
+                    clause_verbs.append(token)
 
         if not root:
             return []
@@ -99,37 +186,36 @@ class RDFTripleExtractor:
         direct_objects = self._find_objects(root)
 
         # Create triples for each object
+        subject_text = self._get_span_text(subject)
         for obj in direct_objects:
             if obj:
                 triple = {
-                    "subject": self._get_span_text(subject),
+                    "subject": subject_text,
                     "predicate": root.lemma_,
                     "object": self._get_span_text(obj)
                 }
                 triples.append(triple)
 
         # Handle additional clause-level relationships
-        for token in sent:
-            # Find clauses that might contain additional triples
-            if token.dep_ in ["ccomp", "xcomp", "advcl"] and token.pos_ == "VERB":
-                clause_subject = self._find_subject(token) or subject
-                clause_objects = self._find_objects(token)
-
-                for obj in clause_objects:
-                    if obj and clause_subject:
-                        triple = {
-                            "subject": self._get_span_text(clause_subject),
-                            "predicate": token.lemma_,
-                            "object": self._get_span_text(obj)
-                        }
-                        triples.append(triple)
+        for token in clause_verbs:
+            clause_subject = self._find_subject(token) or subject
+            clause_objects = self._find_objects(token)
+
+            for obj in clause_objects:
+                if obj and clause_subject:
+                    triple = {
+                        "subject": self._get_span_text(clause_subject),
+                        "predicate": token.lemma_,
+                        "object": self._get_span_text(obj)
+                    }
+                    triples.append(triple)
 
         return triples
 
     def _find_subject(self, verb) -> Optional[spacy.tokens.Span]:
         """Find the subject related to a verb"""
         for child in verb.children:
-            if child.dep_ in ["nsubj", "nsubjpass"]:
+            if child.dep in _SUBJECT_DEPS:
                 return self._expand_noun_phrase(child)
         return None
 
@@ -138,15 +224,15 @@ class RDFTripleExtractor:
         objects = []
 
         for child in verb.children:
-            if child.dep_ in ["dobj", "attr", "pobj"]:
+            if child.dep in _OBJECT_DEPS:
                 obj = self._expand_noun_phrase(child)
                 if obj:
                     objects.append(obj)
 
             # Handle preposition + object
-            elif child.dep_ == "prep":
+            elif child.dep == _PREP:
                 for grandchild in child.children:
-                    if grandchild.dep_ == "pobj":
+                    if grandchild.dep == _POBJ:
                         # Include the preposition in the predicate
                         prep_obj = self._expand_noun_phrase(grandchild)
                         if prep_obj:
@@ -156,7 +242,7 @@ class RDFTripleExtractor:
 
     def _expand_noun_phrase(self, token) -> Optional[spacy.tokens.Span]:
         """Expand a noun to include its modifiers and form a complete noun phrase"""
-        if not token or token.pos_ not in ["NOUN", "PROPN", "PRON"]:
+        if not token or token.pos not in _NOUN_PHRASE_POS:
             return None
 
         # Find the start and end indices of the expanded noun phrase
@@ -165,17 +251,16 @@ class RDFTripleExtractor:
 
         # Find the head of the noun phrase
         head = token
-        while head.head.pos_ in ["NOUN", "PROPN"] and head.dep_ in ["compound", "amod"]:
+        while head.head.pos in _NOUN_POS and head.dep in _TRAILING_MODIFIER_DEPS:
             head = head.head
             end_idx = head.i + 1
 
-        # Find all words that modify the noun
-        for t in token.doc:
-            if t.head == head or t.head == token:
-                if t.dep_ in ["det", "amod", "compound", "nummod", "quantmod"] and t.i < start_idx:
-                    start_idx = t.i
-                elif t.dep_ in ["amod", "compound"] and t.i >= end_idx:
-                    end_idx = t.i + 1
+        # Find all words that modify the noun (its dependency children, not a scan of the whole doc)
+        for t in chain(head.children, token.children):
+            if t.dep in _MODIFIER_DEPS and t.i < start_idx:
+                start_idx = t.i
+            elif t.dep in _TRAILING_MODIFIER_DEPS and t.i >= end_idx:
+                end_idx = t.i + 1
 
         return token.doc[start_idx:end_idx]
 
@@ -185,148 +270,165 @@ class RDFTripleExtractor:
             return ""
         return span.text.strip()
 
-    def to_rdf_format(self, triples: List[Dict[str, str]], format: str = "turtle") -> str:
+    def to_rdf_format(self, triples: List[Dict[str, str]], format: str = "turtle",
+                      prepared: Optional[Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, str]]] = None) -> str:
         """
         Convert extracted triples to RDF format string.
 
         Args:
             triples: List of triples (dicts with subject, predicate, object)
             format: Output format ("turtle", "n-triples", or "xml")
+            prepared: Result of _prepare(triples), to share grouping and URI work between formats
 
         Returns:
             String representation in the requested RDF format
         """
+        output = io.StringIO()
+        self.to_rdf_stream(triples, output, format, prepared)
+        return output.getvalue()
+
+    def to_rdf_stream(self, triples: List[Dict[str, str]], fh: TextIO, format: str = "turtle",
+                      prepared: Optional[Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, str]]] = None) -> None:
+        """
+        Write extracted triples in an RDF format directly to a file object,
+        without building the whole serialization in memory.
+
+        Args:
+            triples: List of triples (dicts with subject, predicate, object)
+            fh: Text file object to write to
+            format: Output format ("turtle", "n-triples", or "xml")
+            prepared: Result of _prepare(triples), to share grouping and URI work between formats
+        """
         if not triples:
-            return ""
+            return
+
+        if prepared is None:
+            prepared = self._prepare(triples)
+        subjects, safe_ids = prepared
 
         if format == "turtle":
-            return self._to_turtle(triples)
+            self._to_turtle_stream(subjects, safe_ids, fh)
         elif format == "n-triples":
-            return self._to_n_triples(triples)
+            self._to_n_triples_stream(triples, safe_ids, fh)
         elif format == "xml":
-            return self._to_rdf_xml(triples)
+            self._to_rdf_xml_stream(subjects, safe_ids, fh)
         else:
             raise ValueError(f"Unsupported format: {format}")
 
-    def _to_turtle(self, triples: List[Dict[str, str]]) -> str:
-        """Convert triples to Turtle format"""
-        output = "@prefix ex: <http://example.org/> .\n\n"
+    def _prepare(self, triples: List[Dict[str, str]]) -> Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, str]]:
+        """
+        Group triples by subject and compute safe URI IDs once for all formats.
+
+        Args:
+            triples: List of triples (dicts with subject, predicate, object)
 
-        # Group by subject
+        Returns:
+            Tuple of (predicate/object pairs grouped by subject, safe ID for every term)
+        """
         subjects = {}
+        safe_ids = {}
+
         for triple in triples:
-            subj = triple["subject"]
+            subj, pred, obj = triple["subject"], triple["predicate"], triple["object"]
+
+            # Group by subject
             if subj not in subjects:
                 subjects[subj] = []
-            subjects[subj].append((triple["predicate"], triple["object"]))
+            subjects[subj].append((pred, obj))
+
+            # Create safe IDs for URIs
+            for term in (subj, pred, obj):
+                if term not in safe_ids:
+                    safe_ids[term] = self._safe_uri(term)
+
+        return subjects, safe_ids
+
+    def _to_turtle_stream(self, subjects: Dict[str, List[Tuple[str, str]]], safe_ids: Dict[str, str],
+                          fh: TextIO) -> None:
+        """Write grouped triples to a file object in Turtle format"""
+        fh.write("@prefix ex: <http://example.org/> .\n\n")
 
         # Generate turtle representation
         for subject, predicates in subjects.items():
-            # Create safe IDs for URIs
-            subject_id = self._safe_uri(subject)
-            output += f"ex:{subject_id}\n"
+            fh.write(f"ex:{safe_ids[subject]}\n")
 
+            last = len(predicates) - 1
             for i, (predicate, obj) in enumerate(predicates):
-                predicate_id = self._safe_uri(predicate)
+                predicate_id = safe_ids[predicate]
 
                 # Check if object looks like a literal or should be a URI
-                if re.match(r'^[0-9]+$', obj) or obj.lower() in ["true", "false"]:
+                if _NUM_RE.match(obj) or obj.lower() in ("true", "false"):
                     # Numeric or boolean
-                    output += f"    ex:{predicate_id} {obj}"
-                elif any(char in obj for char in ',."\'(){}[]'):
+                    value = obj
+                elif not _LIT_CHARS.isdisjoint(obj):
                     # Likely a literal
-                    output += f'    ex:{predicate_id} "{obj}"'
+                    value = f'"{obj}"'
                 else:
                     # Likely a reference to another entity
-                    obj_id = self._safe_uri(obj)
-                    output += f"    ex:{predicate_id} ex:{obj_id}"
+                    value = f"ex:{safe_ids[obj]}"
 
-                if i < len(predicates) - 1:
-                    output += " ;\n"
-                else:
-                    output += " .\n\n"
-
-        return output
-
-    def _to_n_triples(self, triples: List[Dict[str, str]]) -> str:
-        """Convert triples to N-Triples format"""
-        output = ""
+                end = " ;\n" if i < last else " .\n\n"
+                fh.write(f"    ex:{predicate_id} {value}{end}")
 
+    def _to_n_triples_stream(self, triples: List[Dict[str, str]], safe_ids: Dict[str, str], fh: TextIO) -> None:
+        """Write triples to a file object in N-Triples format"""
         for triple in triples:
-            subject_id = self._safe_uri(triple["subject"])
-            predicate_id = self._safe_uri(triple["predicate"])
+            subject_id = safe_ids[triple["subject"]]
+            predicate_id = safe_ids[triple["predicate"]]
             obj = triple["object"]
 
-            if any(char in obj for char in ',."\'(){}[]') or re.match(r'^[0-9]+$', obj):
+            if not _LIT_CHARS.isdisjoint(obj) or _NUM_RE.match(obj):
                 # Likely a literal
-                output += f'<http://example.org/{subject_id}> <http://example.org/{predicate_id}> "{obj}" .\n'
+                fh.write(f'<http://example.org/{subject_id}> <http://example.org/{predicate_id}> "{obj}" .\n')
             else:
                 # Likely a reference
-                obj_id = self._safe_uri(obj)
-                output += f'<http://example.org/{subject_id}> <http://example.org/{predicate_id}> <http://example.org/{obj_id}> .\n'
-
-        return output
+                obj_id = safe_ids[obj]
+                fh.write(f'<http://example.org/{subject_id}> <http://example.org/{predicate_id}> <http://example.org/{obj_id}> .\n')
 
-    def _to_rdf_xml(self, triples: List[Dict[str, str]]) -> str:
-        """Convert triples to RDF/XML format"""
-        output = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        output += '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"\n'
-        output += '         xmlns:ex="http://example.org/">\n\n'
-
-        # Group by subject
-        subjects = {}
-        for triple in triples:
-            subj = triple["subject"]
-            if subj not in subjects:
-                subjects[subj] = []
-            subjects[subj].append((triple["predicate"], triple["object"]))
+    def _to_rdf_xml_stream(self, subjects: Dict[str, List[Tuple[str, str]]], safe_ids: Dict[str, str],
+                           fh: TextIO) -> None:
+        """Write grouped triples to a file object in RDF/XML format"""
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"\n'
+                 '         xmlns:ex="http://example.org/">\n\n')
 
         # Generate RDF/XML
         for subject, predicates in subjects.items():
-            subject_id = self._safe_uri(subject)
-            output += f'  <rdf:Description rdf:about="http://example.org/{subject_id}">\n'
+            fh.write(f'  <rdf:Description rdf:about="http://example.org/{safe_ids[subject]}">\n')
 
             for predicate, obj in predicates:
-                predicate_id = self._safe_uri(predicate)
+                predicate_id = safe_ids[predicate]
 
-                if any(char in obj for char in ',."\'(){}[]') or re.match(r'^[0-9]+$', obj):
+                if not _LIT_CHARS.isdisjoint(obj) or _NUM_RE.match(obj):
                     # Likely a literal
-                    output += f'    <ex:{predicate_id}>{obj}</ex:{predicate_id}>\n'
+                    fh.write(f'    <ex:{predicate_id}>{obj}</ex:{predicate_id}>\n')
                 else:
                     # Likely a reference
-                    obj_id = self._safe_uri(obj)
-                    output += f'    <ex:{predicate_id} rdf:resource="http://example.org/{obj_id}"/>\n'
+                    obj_id = safe_ids[obj]
+                    fh.write(f'    <ex:{predicate_id} rdf:resource="http://example.org/{obj_id}"/>\n')
 
-            output += '  </rdf:Description>\n\n'
+            fh.write('  </rdf:Description>\n\n')
 
-        output += '</rdf:RDF>'
-        return output
+        fh.write('</rdf:RDF>')
 
-    def _safe_uri(self, text: str) -> str:
-        """Convert text to a safe URI part"""
+    @staticmethod
+    @lru_cache(maxsize=1 << 16)
+    def _safe_uri(text: str) -> str:
+        """Convert text to a safe URI part (memoized, as terms repeat heavily)"""
         # Remove special characters and replace spaces with underscores
-        safe = re.sub(r'[^a-zA-Z0-9 ]', '', text)
+        safe = _NON_URI_RE.sub('', text)
         safe = safe.replace(' ', '_').lower()
         return safe
 
 
 # Example usage
 def example():
-    # Initialize the extractor
-    extractor = RDFTripleExtractor()
+    # Initialize the extractor, using every spare core for the pipe
+    extractor = RDFTripleExtractor(n_process=N_PROCESS)
 
     # Sample text
     with open("ISO-15288_Section3_Final copy.txt", "r", encoding="utf-8") as file:
         text = file.read()
-    # Save to files
-    with open("output_turtle.ttl", "w", encoding="utf-8") as f:
-        f.write(turtle)
-
-    with open("output_ntriples.nt", "w", encoding="utf-8") as f:
-        f.write(n_triples)
-
-    with open("output_rdf.xml", "w", encoding="utf-8") as f:
-        f.write(rdf_xml)
 
     # Extract triples
     triples = extractor.extract_triples(text)
@@ -339,10 +441,19 @@ def example():
         print(f"Object: {t['object']}")
         print()
 
-    # Convert to RDF formats
-    turtle = extractor.to_rdf_format(triples, "turtle")
-    n_triples = extractor.to_rdf_format(triples, "n-triples")
-    rdf_xml = extractor.to_rdf_format(triples, "xml")
+    # Convert to RDF formats, grouping the triples only once
+    prepared = extractor._prepare(triples)
+    turtle = extractor.to_rdf_format(triples, "turtle", prepared)
+
+    # Save to files (formats that are not printed are streamed straight to disk)
+    with open("output_turtle.ttl", "w", encoding="utf-8") as f:
+        f.write(turtle)
+
+    with open("output_ntriples.nt", "w", encoding="utf-8") as f:
+        extractor.to_rdf_stream(triples, f, "n-triples", prepared)
+
+    with open("output_rdf.xml", "w", encoding="utf-8") as f:
+        extractor.to_rdf_stream(triples, f, "xml", prepared)
 
     # Print Turtle format
     print("Turtle Format:")
@@ -1,69 +1,106 @@
 import csv
 import argparse
+import functools
+import os
+import re
 import spacy
+from spacy.strings import get_string_id
+from spacy.symbols import NOUN, PROPN, VERB
 from itertools import product
 
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK = re.compile(r"[ \t]*(?:\r\n?|\n)(?:[ \t]*(?:\r\n?|\n))+")
 
-def extract_triples_with_nlp(text):
+# Batch size and worker count for nlp.pipe
+BATCH_SIZE = 64
+N_PROCESS = max(1, (os.cpu_count() or 1) - 1)
+
+# Output file buffer size (1 MiB)
+WRITE_BUFFER = 1 << 20
+
+# Integer IDs compared against token.pos / token.dep instead of the pos_ / dep_ strings
+NOUN_POS = frozenset({NOUN, PROPN})
+SUBJECT_DEPS = frozenset(get_string_id(dep) for dep in ("nsubj", "nsubjpass"))
+OBJECT_DEPS = frozenset(get_string_id(dep) for dep in ("dobj", "pobj", "attr"))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_nlp(name="en_core_web_sm", disable=("ner", "lemmatizer")):
+    """
+    Load a spaCy model once and reuse it for every call.
+    NER and lemmas are never used; attribute_ruler is kept because it provides pos_.
+    """
+    return spacy.load(name, disable=list(disable))
+
+
+def extract_triples_with_nlp(text, n_process=1):
     """
     Extract RDF triples from text using NLP to identify subjects (nouns),
     predicates (verbs), and objects (nouns).
+
+    Args:
+        text (str): Input text to process
+        n_process (int): Number of worker processes for nlp.pipe
     """
-    # Load English language model
-    nlp = spacy.load("en_core_web_sm")
+    # Load English language model (cached after the first call)
+    nlp = _get_nlp()
 
-    # Process the text
-    doc = nlp(text)
+    # Split into paragraphs so spaCy can stream them in batches
+    paragraphs = [p for p in PARAGRAPH_BREAK.split(text) if p.strip()]
 
-    # Use a set to store unique triples
-    unique_triples = set()
+    # Use a dict as an insertion-ordered set of unique triples
+    unique_triples = {}
 
     # Process each sentence separately
-    for sent in doc.sents:
+    sents = (sent for doc in nlp.pipe(paragraphs, batch_size=BATCH_SIZE, n_process=n_process) for sent in doc.sents)
+    for sent in sents:
         subjects = []
         predicates = []
         objects = []
+        ambiguous = []
 
         # Identify nouns and verbs
         for token in sent:
             # Find nouns (subjects and objects)
-            if token.pos_ in ["NOUN", "PROPN"]:
+            if token.pos in NOUN_POS:
                 # Check if it's likely a subject or object based on dependency
-                if token.dep_ in ["nsubj", "nsubjpass"]:
+                if token.dep in SUBJECT_DEPS:
                     subjects.append(token.text)
-                elif token.dep_ in ["dobj", "pobj", "attr"]:
+                elif token.dep in OBJECT_DEPS:
                     objects.append(token.text)
                 else:
-                    # If dependency doesn't clearly indicate role, add to both for consideration
-                    subjects.append(token.text)
-                    objects.append(token.text)
+                    # Dependency doesn't clearly indicate the role, only consider it if a role has no candidate
+                    ambiguous.append(token.text)
 
             # Find verbs (predicates)
-            elif token.pos_ == "VERB":
+            elif token.pos == VERB:
                 predicates.append(token.text)
 
+        # Fall back to the ambiguous nouns only for a missing role, keeping the product small
+        subjects = subjects or ambiguous
+        objects = objects or ambiguous
+
         # If we have found potential subjects, predicates, and objects
         if subjects and predicates and objects:
-            # Create triples from all combinations of subjects, predicates, and objects
-            for subj, pred, obj in product(subjects, predicates, objects):
+            # Create triples from all combinations of distinct subjects, predicates, and objects
+            for subj, pred, obj in product(dict.fromkeys(subjects), dict.fromkeys(predicates), dict.fromkeys(objects)):
                 # Avoid self-referential triples
                 if subj != obj:
                     # Add to set of unique triples
-                    unique_triples.add((subj, pred, obj))
+                    unique_triples[(subj, pred, obj)] = None
 
-    # Convert set back to list for further processing
+    # Convert to a list (in order of first appearance) for further processing
     return list(unique_triples)
 
 
 def write_triples_to_csv(triples, output_file):
     """Write extracted triples to a CSV file."""
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+    with open(output_file, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER) as csvfile:
         writer = csv.writer(csvfile)
         # Write header
         writer.writerow(['Subject', 'Predicate', 'Object'])
         # Write data
-        for triple in triples:
-            writer.writerow(triple)
+        writer.writerows(triples)
 
     print(f"Extracted {len(triples)} unique triples to {output_file}")
 
@@ -80,7 +117,7 @@ def main():
         try:
             import spacy
             try:
-                nlp = spacy.load("en_core_web_sm")
+                _get_nlp()
             except OSError:
                 print("Installing required spaCy model...")
                 import subprocess
@@ -95,8 +132,8 @@ def main():
         with open(args.input_file, 'r', encoding='utf-8') as file:
             text = file.read()
 
-        # Extract unique triples using NLP
-        triples = extract_triples_with_nlp(text)
+        # Extract unique triples using NLP, using every spare core for the pipe
+        triples = extract_triples_with_nlp(text, n_process=N_PROCESS)
 
         if not triples:
             print("No triples found in the input file.")